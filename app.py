@@ -8,7 +8,7 @@ from flask import Flask, render_template, request, redirect, url_for, flash, sen
 from PIL import Image # New import for PDF conversion
 
 # Import helper functions
-from helpers import generate_certificate # New import
+from helpers import generate_certificate, preflight_certificates, build_font_index # New import
 
 # Configure application
 app = Flask(__name__)
@@ -17,6 +17,12 @@ app.config['UPLOAD_FOLDER_TEMPLATES'] = 'static/templates'
 app.config['UPLOAD_FOLDER_CERTS'] = 'static/certs'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB max upload size
 
+# Maximum number of preflight problems flashed at once after a failed /generate
+PREFLIGHT_FLASH_LIMIT = 10
+
+# Warm the glyph coverage cache for the bundled fonts so preflight checks are cheap
+build_font_index()
+
 # Ensure the database file exists before connecting
 if not os.path.exists("certs.db"):
     open("certs.db", "w").close()
@@ -306,6 +312,17 @@ def generate():
         template = db.execute("SELECT * FROM templates WHERE id = ?", template_id)[0]
         participants = db.execute("SELECT * FROM participants WHERE id IN (" + ",".join("?" for _ in selected_participant_ids) + ")", *selected_participant_ids)
 
+        # Validate the whole batch before rendering anything
+        problems = preflight_certificates([dict(p) for p in participants], template)
+        if problems:
+            # Only flash the first few problems; flashed messages live in the session cookie
+            for problem in problems[:PREFLIGHT_FLASH_LIMIT]:
+                flash(problem, "danger")
+            if len(problems) > PREFLIGHT_FLASH_LIMIT:
+                flash(f"...and {len(problems) - PREFLIGHT_FLASH_LIMIT} more problem(s) not shown.", "danger")
+            flash(f"No certificates were generated: {len(problems)} problem(s) found during preflight.", "danger")
+            return redirect(url_for('generate'))
+
         generated_count = 0
         for participant in participants:
             # Convert participant data to dict as generate_certificate expects dict
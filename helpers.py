@@ -1,8 +1,257 @@
 import os
 import json
 import uuid # New import
+import struct
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 
+FONTS_DIR = "static/fonts"
+
+
+@lru_cache(maxsize=64)
+def _load_font(font_path, font_size, mtime):
+    """Load a TrueType/OpenType font once per (path, size) and reuse it across certificates; mtime keys the cache."""
+    return ImageFont.truetype(font_path, font_size)
+
+
+@lru_cache(maxsize=32)
+def _template_size(template_path, mtime):
+    """Return (width, height) of a template image. Only the image header is read; mtime keys the cache."""
+    with Image.open(template_path) as img:
+        return img.size
+
+
+def _resolve_field_text(participant, field_name):
+    """
+    Looks up the text for a template field, first in the standard participant
+    columns and then in the participant's custom_fields JSON.
+
+    Returns:
+        tuple: (text, error) where text is "" if no value was found and error is
+               a message if custom_fields could not be decoded, otherwise None.
+    """
+    # First, check standard participant fields (name, email, event, position, date)
+    if field_name in participant and participant[field_name] is not None:
+        return str(participant[field_name]), None
+    # If not found in standard fields, check custom_fields JSON
+    if "custom_fields" in participant and participant["custom_fields"]:
+        try:
+            custom_fields_dict = json.loads(participant["custom_fields"])
+        except json.JSONDecodeError:
+            return "", "Could not decode custom_fields"
+        if field_name in custom_fields_dict and custom_fields_dict[field_name] is not None:
+            return str(custom_fields_dict[field_name]), None
+    return "", None
+
+
+def _read_cmap_codepoints(data):
+    """Parse the Unicode subtables (formats 4 and 12) of an sfnt 'cmap' table."""
+    codepoints = set()
+    offset = 0
+    if data[:4] not in (b"\x00\x01\x00\x00", b"OTTO", b"true", b"ttcf"):
+        # Not an sfnt font (e.g. WOFF), so there is no plain cmap table to read
+        return None
+    if data[:4] == b"ttcf":
+        # Font collection: index the first font in the file
+        offset = struct.unpack_from(">I", data, 12)[0]
+
+    num_tables = struct.unpack_from(">H", data, offset + 4)[0]
+    cmap_offset = None
+    for i in range(num_tables):
+        tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + i * 16)
+        if tag == b"cmap":
+            cmap_offset = table_offset
+            break
+    if cmap_offset is None:
+        return None
+
+    num_subtables = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+    for i in range(num_subtables):
+        platform_id, encoding_id, sub_offset = struct.unpack_from(">HHI", data, cmap_offset + 4 + i * 8)
+        if not (platform_id == 0 or (platform_id == 3 and encoding_id in (1, 10))):
+            continue
+        sub = cmap_offset + sub_offset
+        sub_format = struct.unpack_from(">H", data, sub)[0]
+
+        if sub_format == 4:
+            seg_count = struct.unpack_from(">H", data, sub + 6)[0] // 2
+            ends = struct.unpack_from(f">{seg_count}H", data, sub + 14)
+            starts = struct.unpack_from(f">{seg_count}H", data, sub + 16 + seg_count * 2)
+            deltas = struct.unpack_from(f">{seg_count}H", data, sub + 16 + seg_count * 4)
+            range_offsets_pos = sub + 16 + seg_count * 6
+            range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_pos)
+            for seg, (start, end) in enumerate(zip(starts, ends)):
+                for char in range(start, min(end, 0xFFFE) + 1):
+                    if range_offsets[seg] == 0:
+                        glyph_id = (char + deltas[seg]) & 0xFFFF
+                    else:
+                        glyph_pos = range_offsets_pos + seg * 2 + range_offsets[seg] + 2 * (char - start)
+                        glyph_id = struct.unpack_from(">H", data, glyph_pos)[0]
+                        if glyph_id:
+                            glyph_id = (glyph_id + deltas[seg]) & 0xFFFF
+                    if glyph_id:
+                        codepoints.add(char)
+
+        elif sub_format == 12:
+            num_groups = struct.unpack_from(">I", data, sub + 12)[0]
+            for g in range(num_groups):
+                start, end, start_glyph = struct.unpack_from(">III", data, sub + 16 + g * 12)
+                # Glyph 0 is .notdef, so a group starting at it does not cover its first char
+                codepoints.update(range(start + (1 if start_glyph == 0 else 0), end + 1))
+
+    return codepoints
+
+
+@lru_cache(maxsize=32)
+def _font_codepoints(font_path, mtime):
+    """Cached cmap lookup for font_codepoints; mtime keys the cache."""
+    with open(font_path, "rb") as f:
+        data = f.read()
+    try:
+        codepoints = _read_cmap_codepoints(data)
+    except struct.error:
+        codepoints = None
+    if codepoints is None:
+        print(f"Warning: Could not read glyph coverage from {font_path}.")
+        return None
+    return frozenset(codepoints)
+
+
+def font_codepoints(font_path):
+    """
+    Returns the set of Unicode codepoints a font file has glyphs for.
+
+    Args:
+        font_path (str): Path to a .ttf/.otf font file.
+
+    Returns:
+        frozenset: Codepoints mapped in the font's cmap table, or None if the
+                   font's cmap table could not be read.
+    """
+    return _font_codepoints(font_path, os.path.getmtime(font_path))
+
+
+def build_font_index(fonts_dir=FONTS_DIR):
+    """
+    Precomputes the glyph coverage index for every font file in fonts_dir.
+
+    The coverage is kept in font_codepoints' cache, so calling this at startup
+    warms the lookups preflight_certificates does later.
+
+    Returns:
+        dict: Mapping of font path to a frozenset of covered codepoints
+              (None for fonts whose coverage could not be read).
+    """
+    index = {}
+    if not os.path.isdir(fonts_dir):
+        return index
+    for filename in sorted(os.listdir(fonts_dir)):
+        if filename.lower().endswith((".ttf", ".otf", ".ttc")):
+            font_path = os.path.join(fonts_dir, filename).replace("\\", "/")
+            index[font_path] = font_codepoints(font_path)
+    return index
+
+
+def preflight_certificates(participants, template_data):
+    """
+    Checks a batch of participants against a template before any rendering is done.
+
+    For every configured field this verifies that the participant has a value,
+    that the field has x/y coordinates, that its font exists and can draw every
+    character, and that the text fits inside the template image.
+
+    Args:
+        participants (list): Participant dicts, as passed to generate_certificate.
+        template_data (dict): A dictionary containing template details
+                              (e.g., 'file_path', 'fields_config').
+
+    Returns:
+        list: Human-readable problem descriptions. Empty if the batch is good to render.
+    """
+    problems = []
+
+    template_path = template_data["file_path"]
+    if not os.path.exists(template_path):
+        return [f"Template image not found at {template_path}."]
+    try:
+        fields_config = json.loads(template_data["fields_config"])
+    except (TypeError, json.JSONDecodeError):
+        return ["Template fields configuration is not valid JSON."]
+    if not isinstance(fields_config, dict):
+        return ["Template fields configuration must be a JSON object of fields."]
+    try:
+        img_width, img_height = _template_size(template_path, os.path.getmtime(template_path))
+    except OSError as e:
+        return [f"Template image {template_path} could not be read: {e}"]
+
+    # Field-level checks that do not depend on the participant
+    fonts = {}
+    coverage = {}
+    for field_name, config in fields_config.items():
+        if not isinstance(config, dict):
+            problems.append(f"Field '{field_name}' configuration must be a JSON object.")
+            continue
+        x, y = config.get("x"), config.get("y")
+        if x is None or y is None:
+            problems.append(f"Field '{field_name}' is missing an x or y coordinate.")
+            continue
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (x, y)):
+            problems.append(f"Field '{field_name}' x and y coordinates must be numbers.")
+            continue
+        font_size = config.get("font_size", 40)
+        if not isinstance(font_size, (int, float)) or isinstance(font_size, bool) or font_size <= 0:
+            problems.append(f"Field '{field_name}' font_size must be a positive number.")
+            continue
+
+        font_path = config.get("font_path")
+        try:
+            if font_path:
+                if not os.path.exists(font_path):
+                    problems.append(f"Font {font_path} for field '{field_name}' was not found.")
+                    continue
+                mtime = os.path.getmtime(font_path)
+                fonts[field_name] = _load_font(font_path, font_size, mtime)
+                # None means coverage is unknown, so the glyph check is skipped for this font
+                coverage[field_name] = font_codepoints(font_path)
+            else:
+                fonts[field_name] = ImageFont.load_default(size=font_size)
+        except (OSError, ValueError) as e:
+            problems.append(f"Font for field '{field_name}' could not be loaded: {e}")
+    if problems:
+        return problems
+
+    for participant in participants:
+        label = participant.get("name") or f"participant ID {participant.get('id')}"
+        for field_name, config in fields_config.items():
+            text, error = _resolve_field_text(participant, field_name)
+            if error:
+                problems.append(f"{label}: {error}.")
+                break
+            if not text:
+                problems.append(f"{label}: no value for field '{field_name}'.")
+                continue
+
+            covered = coverage.get(field_name)
+            if covered is not None:
+                missing = sorted({c for c in text if not c.isspace() and ord(c) not in covered})
+                if missing:
+                    font_name = os.path.basename(config["font_path"])
+                    problems.append(f"{label}: font {font_name} cannot draw {''.join(missing)!r} in field '{field_name}'.")
+                    continue
+
+            try:
+                left, top, right, bottom = fonts[field_name].getbbox(text)
+            except Exception as e:
+                problems.append(f"{label}: could not measure text for field '{field_name}': {e}")
+                continue
+            x = config["x"] - ((right - left) / 2 if config.get("align") == "center" else 0)
+            y = config["y"]
+            if x + left < 0 or x + right > img_width or y + top < 0 or y + bottom > img_height:
+                problems.append(f"{label}: text for field '{field_name}' overflows the template image.")
+
+    return problems
+
+
 def generate_certificate(participant, template_data, output_dir="static/certs"):
     """
     Generates a certificate image for a given participant and template.
@@ -37,18 +286,9 @@ def generate_certificate(participant, template_data, output_dir="static/certs"):
 
         # Iterate through fields and draw text
         for field_name, config in fields_config.items():
-            text_to_draw = ""
-            # First, check standard participant fields (name, email, event, position, date)
-            if field_name in participant and participant[field_name] is not None:
-                text_to_draw = str(participant[field_name])
-            # If not found in standard fields, check custom_fields JSON
-            elif "custom_fields" in participant and participant["custom_fields"]:
-                try:
-                    custom_fields_dict = json.loads(participant["custom_fields"])
-                    if field_name in custom_fields_dict and custom_fields_dict[field_name] is not None:
-                        text_to_draw = str(custom_fields_dict[field_name])
-                except json.JSONDecodeError:
-                    print(f"Warning: Could not decode custom_fields for participant ID {participant.get('id')}. Skipping custom field lookup for '{field_name}'.")
+            text_to_draw, error = _resolve_field_text(participant, field_name)
+            if error:
+                print(f"Warning: {error} for participant ID {participant.get('id')}. Skipping custom field lookup for '{field_name}'.")
             
             if text_to_draw: # Only proceed if we actually have text
                 x = config.get("x")
@@ -65,7 +305,7 @@ def generate_certificate(participant, template_data, output_dir="static/certs"):
                 font = None
                 if font_path:
                     try:
-                        font = ImageFont.truetype(font_path, font_size)
+                        font = _load_font(font_path, font_size, os.path.getmtime(font_path))
                     except IOError:
                         print(f"Warning: Font {font_path} not found. Using default Pillow font with specified size.")
                     except Exception as font_e: